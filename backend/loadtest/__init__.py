@@ -0,0 +1,8 @@
+"""
+Offline load-testing harness for the NeuralAcademy backend.
+
+- fake_openai: OpenAI-compatible stub server with tunable latency,
+  token rate and error injection.
+- driver: replays mixed traffic against main.app and reports
+  throughput, latency percentiles and error/fallback rates.
+"""
@@ -0,0 +1,648 @@
+"""
+Open-loop load driver for the NeuralAcademy backend.
+
+Launches the fake OpenAI stub and `uvicorn main:app` locally (or targets
+an already running server), replays a weighted mix of uploads, study
+sheets, challenges, run-code and analyze-code requests at a fixed arrival
+rate, and reports per-endpoint throughput, p50/p95/p99 latency and
+error/fallback rates.
+
+Requests are scheduled independently of completions, and latency is
+measured from the scheduled send time, so a stalled server shows up as
+growing latency instead of a silently lower request rate. A low-rate
+GET /status probe runs alongside the mix: since every AI endpoint does
+blocking work inside `async def`, the probe's latency tracks how long
+the event loop is blocked.
+
+Examples (from backend/):
+
+    python -m loadtest.driver --rate 10 --duration 30
+    python -m loadtest.driver --rates 2,5,10,20 --workers 1,2,4 --json sweep.json
+    python -m loadtest.driver --target http://127.0.0.1:8000 --rate 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import httpx
+
+from loadtest.fake_openai import add_stub_arguments, stub_config_from_args
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+ENDPOINTS = ["upload", "study-sheet", "challenge", "run-code", "analyze-code"]
+DEFAULT_MIX = {"upload": 1, "study-sheet": 3, "challenge": 2, "run-code": 2, "analyze-code": 2}
+PROBE = "status-probe"
+MIN_GROWTH_SAMPLES = 6  # per endpoint, before it counts towards latency growth
+MAX_ERROR_RATE = 0.05  # mix error rate above this marks a step saturated
+MIN_THROUGHPUT_RATIO = 0.8  # achieved / offered below this marks a step saturated
+
+
+# ---------- Request payloads ----------
+
+STUDY_TEXTS = [
+    (
+        "Recursion is a technique where a function solves a problem by calling itself "
+        "on smaller inputs. Every recursive function needs a base case that stops the "
+        "recursion, otherwise the call stack grows until the interpreter gives up.\n\n"
+        "The call stack stores one frame per active call. Each frame keeps local "
+        "variables and the return address, which is why very deep recursion can be "
+        "slower and more memory hungry than an equivalent loop written by hand."
+    ),
+    (
+        "Hash tables map keys to values using a hash function that turns each key into "
+        "an array index. Collisions happen when two keys land on the same index and are "
+        "resolved with chaining or open addressing.\n\n"
+        "A good hash function spreads keys uniformly, keeping lookups close to constant "
+        "time. When the load factor grows too high the table is resized and every entry "
+        "is rehashed into a larger backing array, which amortizes nicely over inserts."
+    ),
+]
+
+CODE_SAMPLES = [
+    "def solve(n):\n    return sum(int(d) for d in str(n))\n\nprint(solve(1234))\n",
+    "def solve(n):\n    if n == 0:\n        return 0\n    return n % 10 + solve(n // 10)\n\nprint(solve(-1))\n",
+    "total = 0\nfor i in range(10000):\n    total += i * i\nprint(total)\n",
+    "print(undefined_name)\n",
+]
+
+
+def make_pdf(pages: int) -> bytes:
+    """
+    Build a small text-only PDF in memory for upload traffic.
+    """
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        body = STUDY_TEXTS[page_num % len(STUDY_TEXTS)]
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"Page {page_num + 1}\n\n{body}")
+    doc.set_metadata({"title": f"Load test {pages}p", "author": "loadtest"})
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def build_request(endpoint: str, rng: random.Random, pdfs: list[bytes]) -> dict:
+    """
+    Return httpx.request keyword arguments for one call to `endpoint`.
+    """
+    if endpoint == "upload":
+        pdf = rng.choice(pdfs)
+        return {
+            "method": "POST",
+            "url": "/upload",
+            "files": {"file": ("notes.pdf", pdf, "application/pdf")},
+        }
+    if endpoint == "study-sheet":
+        return {"method": "POST", "url": "/generate-study-sheet", "json": {"text": rng.choice(STUDY_TEXTS)}}
+    if endpoint == "challenge":
+        return {"method": "POST", "url": "/generate-coding-challenge", "json": {"text": rng.choice(STUDY_TEXTS)}}
+    if endpoint == "run-code":
+        return {"method": "POST", "url": "/run-code", "json": {"text": rng.choice(CODE_SAMPLES)}}
+    if endpoint == "analyze-code":
+        return {"method": "POST", "url": "/analyze-code", "json": {"text": rng.choice(CODE_SAMPLES)}}
+    if endpoint == PROBE:
+        return {"method": "GET", "url": "/status"}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def is_fallback(endpoint: str, body: dict) -> bool:
+    """
+    True when a 2xx response came from a degraded path instead of the LLM.
+
+    For run-code there is no LLM; sandbox timeouts count as degraded.
+    """
+    if endpoint == "study-sheet":
+        return body.get("phase") != "2-ai-powered" or body.get("main_idea") == "OpenAI API key not configured."
+    if endpoint == "challenge":
+        return body.get("title") in {"Sample Challenge", "API Key Required"}
+    if endpoint == "analyze-code":
+        return body.get("phase") != "3-ai-tutor" or body.get("analysis") == "OpenAI API key not configured."
+    if endpoint == "run-code":
+        return body.get("status") == "timeout"
+    return False
+
+
+# ---------- Measurement ----------
+
+
+@dataclass
+class EndpointStats:
+    samples: list[tuple[float, float]] = field(default_factory=list)  # (scheduled, latency_ms)
+    completions: list[float] = field(default_factory=list)  # finish time of each ok response
+    ok: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    error_kinds: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def total(self) -> int:
+        return self.ok + self.errors
+
+    @property
+    def latencies_ms(self) -> list[float]:
+        return [latency for _, latency in self.samples]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    # Nearest-rank percentile; 0.0 for empty input.
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_growth(samples_by_endpoint: dict[str, list[tuple[float, float]]]) -> float | None:
+    """
+    Median latency of the last third of a step divided by the first third.
+
+    Each sample is first divided by its endpoint's median, so a 15 ms upload
+    and a 2 s LLM call weigh the same and the mix landing in each third does
+    not skew the ratio. Endpoints with fewer than MIN_GROWTH_SAMPLES samples
+    are skipped. Stays near 1.0 while the server keeps up; climbs when a
+    queue builds. None when there is too little data to tell.
+    """
+    normalized = []
+    for samples in samples_by_endpoint.values():
+        if len(samples) < MIN_GROWTH_SAMPLES:
+            continue
+        median = percentile([latency for _, latency in samples], 50)
+        if median <= 0:
+            continue
+        normalized.extend((scheduled, latency / median) for scheduled, latency in samples)
+    if not normalized:
+        return None
+    ordered = [ratio for _, ratio in sorted(normalized)]
+    third = len(ordered) // 3
+    first = percentile(ordered[:third], 50)
+    last = percentile(ordered[-third:], 50)
+    return round(last / first, 2) if first else None
+
+
+def window_throughput(completions: list[float], start: float, duration: float) -> float:
+    """
+    Successful completions per second inside the arrival window.
+
+    The window runs from the first completion to the last scheduled arrival,
+    which leaves out both the warm-up before any response and the drain tail
+    after the last arrival. A step that keeps up reads close to the offered
+    rate; 0.0 when nothing finished before arrivals stopped.
+    """
+    end = start + duration
+    in_window = sorted(c for c in completions if c <= end)
+    if len(in_window) < 2:
+        return 0.0
+    # The first completion opens the window, so count the ones after it.
+    return round((len(in_window) - 1) / (end - in_window[0]), 2)
+
+
+def summarize(stats: dict[str, EndpointStats], start: float, duration: float) -> dict[str, dict]:
+    report = {}
+    for endpoint, s in stats.items():
+        report[endpoint] = {
+            "requests": s.total,
+            "throughput_rps": window_throughput(s.completions, start, duration),
+            "p50_ms": round(percentile(s.latencies_ms, 50), 1),
+            "p95_ms": round(percentile(s.latencies_ms, 95), 1),
+            "p99_ms": round(percentile(s.latencies_ms, 99), 1),
+            "error_rate": round(s.errors / s.total, 4) if s.total else 0.0,
+            "fallback_rate": round(s.fallbacks / s.ok, 4) if s.ok else 0.0,
+            "error_kinds": dict(s.error_kinds),
+        }
+    return report
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    request: dict,
+    scheduled: float,
+    stats: EndpointStats,
+) -> None:
+    try:
+        response = await client.request(**request)
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        if response.status_code >= 400:
+            stats.errors += 1
+            stats.error_kinds[f"http_{response.status_code}"] += 1
+        else:
+            try:
+                body = response.json()
+            except ValueError:
+                # 2xx with a non-JSON body, e.g. a proxy error page.
+                stats.errors += 1
+                stats.error_kinds["bad_json"] += 1
+            else:
+                stats.ok += 1
+                stats.completions.append(time.perf_counter())
+                if is_fallback(endpoint, body):
+                    stats.fallbacks += 1
+    except httpx.TimeoutException:
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        stats.errors += 1
+        stats.error_kinds["timeout"] += 1
+    except httpx.HTTPError as e:
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        stats.errors += 1
+        stats.error_kinds[type(e).__name__] += 1
+    stats.samples.append((scheduled, latency_ms))
+
+
+async def _monitor_driver_lag(stop: asyncio.Event, samples: list[float], interval: float = 0.01) -> None:
+    # Lag in the driver's own loop; if large, the driver is the bottleneck.
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_step(
+    base_url: str,
+    rate: float,
+    duration: float,
+    mix: dict[str, float],
+    probe_rate: float,
+    timeout: float,
+    max_connections: int,
+    poisson: bool,
+    seed: int | None,
+) -> dict:
+    """
+    Drive one (rate, duration) step and return its report.
+    """
+    rng = random.Random(seed)
+    pdfs = [make_pdf(pages) for pages in (1, 5, 20)]
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    # Build the full arrival schedule up front so scheduling costs nothing later.
+    schedule: list[tuple[float, str]] = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate) if poisson else 1 / rate
+        if t >= duration:
+            break
+        schedule.append((t, rng.choices(names, weights)[0]))
+    if probe_rate > 0:
+        schedule.extend((i / probe_rate, PROBE) for i in range(int(duration * probe_rate)))
+    schedule.sort()
+
+    stats: dict[str, EndpointStats] = {name: EndpointStats() for name in names}
+    if probe_rate > 0:
+        stats[PROBE] = EndpointStats()
+
+    lag_samples: list[float] = []
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        monitor = asyncio.create_task(_monitor_driver_lag(stop, lag_samples))
+        tasks = []
+        start = time.perf_counter()
+        for offset, endpoint in schedule:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            request = build_request(endpoint, rng, pdfs)
+            tasks.append(asyncio.create_task(_send(client, endpoint, request, scheduled, stats[endpoint])))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+
+    report = summarize(stats, start, duration)
+    mix_stats = [s for name, s in stats.items() if name != PROBE]
+    all_latencies = [latency for s in mix_stats for latency in s.latencies_ms]
+    total = sum(s.total for s in mix_stats)
+    ok = sum(s.ok for s in mix_stats)
+    return {
+        "offered_rps": rate,
+        "achieved_rps": window_throughput([c for s in mix_stats for c in s.completions], start, duration),
+        "elapsed_s": round(elapsed, 2),
+        "drain_s": round(max(0.0, elapsed - duration), 2),
+        "requests": total,
+        "p50_ms": round(percentile(all_latencies, 50), 1),
+        "p95_ms": round(percentile(all_latencies, 95), 1),
+        "p99_ms": round(percentile(all_latencies, 99), 1),
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "fallback_rate": round(sum(s.fallbacks for s in mix_stats) / ok, 4) if ok else 0.0,
+        "latency_growth": latency_growth({name: s.samples for name, s in stats.items() if name != PROBE}),
+        "driver_lag_max_ms": round(max(lag_samples, default=0.0), 1),
+        "endpoints": report,
+    }
+
+
+# ---------- Local servers ----------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited early with code {proc.returncode}: {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not become ready: {url}")
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def start_stub(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    config = stub_config_from_args(args, prefix="llm-")
+    cmd = [sys.executable, "-m", "loadtest.fake_openai", "--port", str(port)]
+    for key, value in asdict(config).items():
+        if value is not None:
+            cmd += [f"--{key.replace('_', '-')}", str(value)]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR)
+    base = f"http://127.0.0.1:{port}"
+    _wait_ready(f"{base}/health", proc)
+    return proc, base
+
+
+def start_app(workers: int, stub_base: str, log_level: str) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "sk-loadtest-fake",
+        "OPENAI_BASE_URL": f"{stub_base}/v1",
+    }
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(workers),
+        "--log-level", log_level,
+        "--no-access-log",
+    ]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    base = f"http://127.0.0.1:{port}"
+    _wait_ready(f"{base}/status", proc)
+    return proc, base
+
+
+def wait_idle(app_base: str, stub_base: str | None, probe_slo_ms: float, timeout: float) -> bool:
+    """
+    Block until the backend has worked off the previous step.
+
+    Abandoned requests keep running server-side (the handlers block inside
+    `async def`), so the next step would otherwise start on a busy server
+    and inherit its upstream calls. Idle means /status answers within the
+    probe SLO and, with a local stub, no LLM call is in flight and the call
+    count stopped changing. Returns False if that never happened in time.
+    """
+    deadline = time.monotonic() + timeout
+    last_count = None
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            status_ok = httpx.get(f"{app_base}/status", timeout=timeout).status_code == 200
+        except httpx.HTTPError:
+            status_ok = False
+        fast = status_ok and (time.perf_counter() - started) * 1000 <= probe_slo_ms
+
+        settled = True
+        if stub_base:
+            stub_stats = httpx.get(f"{stub_base}/stats").json()
+            count = stub_stats["counts"].get("requests", 0)
+            settled = stub_stats["in_flight"] == 0 and count == last_count
+            last_count = count
+
+        if fast and settled:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+# ---------- Reporting ----------
+
+
+def print_step(label: str, result: dict) -> None:
+    print(
+        f"\n=== {label}: offered {result['offered_rps']} rps, achieved {result['achieved_rps']} rps "
+        f"over {result['elapsed_s']}s (driver lag max {result['driver_lag_max_ms']} ms) ==="
+    )
+    header = f"{'endpoint':<14}{'reqs':>6}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err%':>7}{'fb%':>7}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in result["endpoints"].items():
+        print(
+            f"{endpoint:<14}{row['requests']:>6}{row['throughput_rps']:>8}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+            f"{row['error_rate'] * 100:>7.1f}{row['fallback_rate'] * 100:>7.1f}"
+        )
+        if row["error_kinds"]:
+            print(f"{'':<14}errors: {row['error_kinds']}")
+    if "upstream" in result:
+        print(f"LLM stub calls: {result['upstream']}")
+
+
+def is_loop_blocked(result: dict, probe_slo_ms: float) -> bool:
+    """
+    True when the /status probe waited longer than the SLO, i.e. the event
+    loop (or every worker's loop) was busy with blocking handler work.
+    """
+    probe = result["endpoints"].get(PROBE)
+    return bool(probe and probe["p95_ms"] > probe_slo_ms)
+
+
+def is_saturated(result: dict, growth_threshold: float) -> bool:
+    """
+    True when requests arrive faster than the workers drain them: any mix
+    request timed out, too many failed, achieved throughput fell well short
+    of the offered rate, latency kept climbing through the step, or the
+    backlog after the last arrival took longer to drain than the step.
+
+    Timeouts are checked explicitly because timed-out samples are capped at
+    --timeout, which hides them from the latency and drain checks.
+    """
+    mix = [row for name, row in result["endpoints"].items() if name != PROBE]
+    if any(row["error_kinds"].get("timeout") for row in mix):
+        return True
+    if result["error_rate"] > MAX_ERROR_RATE:
+        return True
+    if result["achieved_rps"] < MIN_THROUGHPUT_RATIO * result["offered_rps"]:
+        return True
+    growth = result["latency_growth"]
+    if growth is not None and growth > growth_threshold:
+        return True
+    return result["drain_s"] > result["elapsed_s"] - result["drain_s"]
+
+
+def _format_growth(growth: float | None) -> str:
+    return "n/a" if growth is None else str(growth)
+
+
+def print_summary(results: list[dict], probe_slo_ms: float, growth_threshold: float) -> None:
+    print("\n=== Saturation summary ===")
+    header = (
+        f"{'workers':>8}{'offered':>9}{'achieved':>10}{'p99 ms':>10}{'growth':>8}"
+        f"{'probe p95':>11}{'err%':>7}{'fb%':>7}  loop-blocked  saturated"
+    )
+    print(header)
+    print("-" * len(header))
+    first_saturated: dict[str, float] = {}
+    for result in results:
+        workers = str(result.get("workers", "-"))
+        probe = result["endpoints"].get(PROBE, {})
+        saturated = is_saturated(result, growth_threshold)
+        if saturated:
+            first_saturated.setdefault(workers, result["offered_rps"])
+        blocked = is_loop_blocked(result, probe_slo_ms)
+        print(
+            f"{workers:>8}{result['offered_rps']:>9}{result['achieved_rps']:>10}{result['p99_ms']:>10}"
+            f"{_format_growth(result['latency_growth']):>8}{probe.get('p95_ms', '-'):>11}{result['error_rate'] * 100:>7.1f}"
+            f"{result['fallback_rate'] * 100:>7.1f}  {'YES' if blocked else 'no':<12}  {'YES' if saturated else 'no'}"
+        )
+    for workers, rate in first_saturated.items():
+        print(f"workers={workers}: first saturated step at {rate} rps")
+
+
+# ---------- CLI ----------
+
+
+def _positive(value: str, cast=float):
+    try:
+        number = cast(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be > 0, got {value}")
+    return number
+
+
+def _parse_list(value: str, cast):
+    items = [_positive(item.strip(), cast) for item in value.split(",") if item.strip()]
+    if not items:
+        raise argparse.ArgumentTypeError("expected a comma-separated list of values")
+    return items
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', expected one of {ENDPOINTS}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{name}': '{weight}'")
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f"weight for '{name}' must be >= 0")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("at least one mix weight must be > 0")
+    return mix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline load test for the NeuralAcademy backend")
+    parser.add_argument("--target", help="Base URL of a running backend; skips launching stub and app")
+    parser.add_argument("--rate", type=_positive, default=5.0, help="Offered requests per second")
+    parser.add_argument("--rates", type=lambda v: _parse_list(v, float), help="Comma list of rates to sweep")
+    parser.add_argument("--workers", type=lambda v: _parse_list(v, int), default=[1], help="Comma list of uvicorn worker counts")
+    parser.add_argument("--duration", type=_positive, default=20.0, help="Seconds per step")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="e.g. upload=1,study-sheet=3,run-code=2")
+    parser.add_argument("--probe-rate", type=float, default=2.0, help="GET /status probes per second, 0 disables")
+    parser.add_argument("--probe-slo-ms", type=float, default=100.0, help="Probe p95 above this marks the loop saturated")
+    parser.add_argument("--growth-threshold", type=float, default=2.0, help="Latency growth above this marks a step saturated")
+    parser.add_argument("--idle-timeout", type=_positive, default=120.0, help="Max seconds to wait for the server to go idle between steps")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-connections", type=int, default=512)
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of a fixed interval")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="Write all step results to this file")
+    parser.add_argument("--app-log-level", default="warning")
+    add_stub_arguments(parser, prefix="llm-")
+    return parser
+
+
+def _run_step(args: argparse.Namespace, base_url: str, rate: float) -> dict:
+    return asyncio.run(
+        run_step(
+            base_url,
+            rate=rate,
+            duration=args.duration,
+            mix=args.mix,
+            probe_rate=args.probe_rate,
+            timeout=args.timeout,
+            max_connections=args.max_connections,
+            poisson=args.poisson,
+            seed=args.seed,
+        )
+    )
+
+
+def _wait_for_idle(args: argparse.Namespace, app_base: str, stub_base: str | None) -> None:
+    if not wait_idle(app_base, stub_base, args.probe_slo_ms, args.idle_timeout):
+        print(f"⚠️  Server still busy after {args.idle_timeout}s; next step starts on a loaded server")
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    rates = args.rates or [args.rate]
+    results = []
+
+    if args.target:
+        for rate in rates:
+            _wait_for_idle(args, args.target, None)
+            result = _run_step(args, args.target, rate)
+            print_step(f"{args.target}", result)
+            results.append(result)
+    else:
+        stub, stub_base = start_stub(args)
+        try:
+            for workers in args.workers:
+                app, app_base = start_app(workers, stub_base, args.app_log_level)
+                try:
+                    for rate in rates:
+                        _wait_for_idle(args, app_base, stub_base)
+                        httpx.post(f"{stub_base}/stats/reset")
+                        result = _run_step(args, app_base, rate)
+                        result["workers"] = workers
+                        result["upstream"] = httpx.get(f"{stub_base}/stats").json()["counts"]
+                        print_step(f"workers={workers}", result)
+                        results.append(result)
+                finally:
+                    _stop(app)
+        finally:
+            _stop(stub)
+
+    print_summary(results, args.probe_slo_ms, args.growth_threshold)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nWrote {len(results)} step(s) to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Local OpenAI-compatible stub for load testing.
+
+Serves POST /v1/chat/completions with canned structured answers that the
+LangChain parsers in processor.py accept, so every AI endpoint takes its
+"real" path without network access. Latency, token rate and error
+injection are configurable.
+
+Run it on its own:
+
+    python -m loadtest.fake_openai --port 8100 --latency-ms 800 --error-rate 0.05
+
+then start the backend with OPENAI_API_KEY=sk-fake and
+OPENAI_BASE_URL=http://127.0.0.1:8100/v1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 500.0  # time to first token
+    jitter_ms: float = 100.0  # +/- uniform jitter on latency_ms
+    tokens_per_sec: float = 80.0  # generation speed, 0 = instant
+    error_rate: float = 0.0  # fraction of calls answered with HTTP 500
+    rate_limit_rate: float = 0.0  # fraction of calls answered with HTTP 429
+    malformed_rate: float = 0.0  # fraction of calls returning unparseable content
+    seed: int | None = None
+
+
+STUDY_SHEET_PAYLOAD = {
+    "main_idea": "Recursion solves a problem by reducing it to smaller instances of itself.",
+    "key_concepts": ["Recursion", "Base case", "Call stack", "Memoization", "Divide and conquer"],
+    "examples": ["Computing factorials", "Walking a file tree", "Merge sort"],
+    "sections": [
+        {"title": "Definition", "summary": "A function that calls itself on a smaller input.", "difficulty": "Easy"},
+        {"title": "Base cases", "summary": "Every recursion needs a stopping condition.", "difficulty": "Easy"},
+        {"title": "Call stack", "summary": "Each call adds a frame until the base case unwinds it.", "difficulty": "Medium"},
+        {"title": "Memoization", "summary": "Caching results turns exponential recursions linear.", "difficulty": "Hard"},
+    ],
+    "questions": [
+        "What is a base case?",
+        "Why can deep recursion overflow the stack?",
+        "How does memoization change the running time of Fibonacci?",
+        "When is iteration preferable to recursion?",
+        "What does the call stack hold for each call?",
+        "How does merge sort use divide and conquer?",
+    ],
+    "tips": [
+        "Trace small inputs by hand.",
+        "Write the base case first.",
+        "Draw the call tree for tricky problems.",
+    ],
+}
+
+CODING_CHALLENGE_PAYLOAD = {
+    "title": "Sum of Digits",
+    "task": "Implement solve(n) that returns the sum of the decimal digits of n using recursion.",
+    "starter_code": "def solve(n):\n    # Your code here\n    pass",
+    "test_cases": [
+        {"input": [0], "output": 0},
+        {"input": [123], "output": 6},
+        {"input": [9999], "output": 36},
+    ],
+}
+
+CODE_ANALYSIS_PAYLOAD = {
+    "analysis": "The function recurses correctly but never reaches its base case for negative input.",
+    "hints": [
+        "Conceptual: what must be true for a recursion to stop?",
+        "Directional: look at how n changes between calls when n < 0.",
+        "Eureka: what happens if you call solve(-1)?",
+    ],
+}
+
+
+def _pick_payload(prompt: str) -> dict:
+    # The format instructions embedded in the prompt name the schema fields.
+    if '"main_idea"' in prompt:
+        return STUDY_SHEET_PAYLOAD
+    if '"starter_code"' in prompt:
+        return CODING_CHALLENGE_PAYLOAD
+    if '"hints"' in prompt:
+        return CODE_ANALYSIS_PAYLOAD
+    return {"answer": "This is a stubbed response."}
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough OpenAI heuristic: ~4 characters per token.
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(
+                part.get("text", "") for part in content if isinstance(part, dict)
+            )
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def _error_response(status_code: int, message: str, error_type: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+    )
+
+
+def create_app(config: StubConfig | None = None) -> FastAPI:
+    """
+    Build the stub FastAPI app for the given configuration.
+    """
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    stats: Counter = Counter()
+    in_flight = 0
+    app = FastAPI(title="Fake OpenAI")
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    @app.get("/stats")
+    async def get_stats():
+        # Upstream call counts; compare with driver totals to see client retries.
+        return {"config": asdict(config), "counts": dict(stats), "in_flight": in_flight}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.clear()
+        return {"ok": True}
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [{"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "stub"}],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            return await _complete(request)
+        finally:
+            in_flight -= 1
+
+    async def _complete(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        latency = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms))
+        await asyncio.sleep(latency / 1000)
+
+        roll = rng.random()
+        if roll < config.error_rate:
+            stats["injected_500"] += 1
+            return _error_response(500, "Injected server error", "server_error")
+        if roll < config.error_rate + config.rate_limit_rate:
+            stats["injected_429"] += 1
+            return _error_response(429, "Injected rate limit", "rate_limit_exceeded")
+
+        prompt = _prompt_text(body)
+        if rng.random() < config.malformed_rate:
+            stats["injected_malformed"] += 1
+            content = "Sorry, I cannot produce JSON right now."
+        else:
+            payload = _pick_payload(prompt)
+            content = "```json\n" + json.dumps(payload, indent=2) + "\n```"
+
+        completion_tokens = _estimate_tokens(content)
+        if config.tokens_per_sec > 0:
+            await asyncio.sleep(completion_tokens / config.tokens_per_sec)
+
+        stats["ok"] += 1
+        prompt_tokens = _estimate_tokens(prompt)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "logprobs": None,
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    """
+    Register StubConfig options on a parser (shared with the driver).
+    """
+    defaults = StubConfig()
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument(f"--{prefix}jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument(f"--{prefix}tokens-per-sec", type=float, default=defaults.tokens_per_sec)
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument(f"--{prefix}rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument(f"--{prefix}malformed-rate", type=float, default=defaults.malformed_rate)
+    parser.add_argument(f"--{prefix}seed", type=int, default=defaults.seed)
+
+
+def stub_config_from_args(args: argparse.Namespace, prefix: str = "") -> StubConfig:
+    attr = prefix.replace("-", "_")
+    return StubConfig(
+        latency_ms=getattr(args, f"{attr}latency_ms"),
+        jitter_ms=getattr(args, f"{attr}jitter_ms"),
+        tokens_per_sec=getattr(args, f"{attr}tokens_per_sec"),
+        error_rate=getattr(args, f"{attr}error_rate"),
+        rate_limit_rate=getattr(args, f"{attr}rate_limit_rate"),
+        malformed_rate=getattr(args, f"{attr}malformed_rate"),
+        seed=getattr(args, f"{attr}seed"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    config = stub_config_from_args(args)
+    print(f"🤖 Fake OpenAI on http://{args.host}:{args.port}/v1 with {config}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
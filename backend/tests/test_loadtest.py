@@ -0,0 +1,183 @@
+import asyncio
+from functools import partial
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from langchain_openai import ChatOpenAI
+
+import processor
+from loadtest.driver import (
+    EndpointStats,
+    _send,
+    is_fallback,
+    is_saturated,
+    latency_growth,
+    percentile,
+    window_throughput,
+)
+from loadtest.fake_openai import StubConfig, create_app
+from main import app
+
+STUDY_TEXT = (
+    "Recursion is a technique where a function calls itself on smaller inputs. "
+    "Every recursive function needs a base case that stops the recursion."
+)
+
+
+def _route_llm_to_stub(monkeypatch, **config) -> TestClient:
+    # Keep the real _get_chat_openai chains, but send their HTTP calls to the stub app.
+    stub = TestClient(create_app(StubConfig(latency_ms=0, jitter_ms=0, tokens_per_sec=0, seed=0, **config)))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://testserver/v1")
+    monkeypatch.setattr(processor, "ChatOpenAI", partial(ChatOpenAI, http_client=stub, max_retries=0))
+    return stub
+
+
+def test_get_chat_openai_honours_openai_base_url(monkeypatch):
+    # The live driver stays offline only because the client reads this variable.
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:8100/v1")
+
+    llm = processor._get_chat_openai(model="gpt-4o", temperature=0.3)
+
+    assert str(llm.client._client.base_url).rstrip("/") == "http://127.0.0.1:8100/v1"
+
+
+@pytest.fixture
+def stubbed_client(monkeypatch):
+    stub = _route_llm_to_stub(monkeypatch)
+    with TestClient(app) as client:
+        yield client, stub
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "path", "text"),
+    [
+        ("study-sheet", "/generate-study-sheet", STUDY_TEXT),
+        ("challenge", "/generate-coding-challenge", STUDY_TEXT),
+        ("analyze-code", "/analyze-code", "def solve(n):\n    return solve(n - 1)\n"),
+    ],
+)
+def test_stub_payloads_take_the_llm_path(stubbed_client, endpoint, path, text):
+    client, stub = stubbed_client
+    response = client.post(path, json={"text": text})
+
+    assert response.status_code == 200
+    assert not is_fallback(endpoint, response.json())
+    assert stub.get("/stats").json()["counts"] == {"requests": 1, "ok": 1}
+
+
+def test_stub_malformed_output_takes_the_fallback_path(monkeypatch):
+    _route_llm_to_stub(monkeypatch, malformed_rate=1.0)
+    with TestClient(app) as client:
+        response = client.post("/generate-study-sheet", json={"text": STUDY_TEXT})
+
+    assert response.json()["phase"] == "2-fallback-fake-ai"
+    assert is_fallback("study-sheet", response.json())
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_growth_ignores_endpoint_mix():
+    # Fast uploads early, slow LLM calls late: no queue, just a different mix.
+    samples = {
+        "upload": [(float(i), 15.0) for i in range(6)],
+        "study-sheet": [(float(i + 6), 1500.0) for i in range(6)],
+    }
+    assert latency_growth(samples) == 1.0
+
+
+def test_latency_growth_detects_queue_buildup():
+    samples = {"study-sheet": [(float(i), 1000.0 * (i + 1)) for i in range(9)]}
+    assert latency_growth(samples) > 2.0
+
+
+def test_latency_growth_needs_enough_samples():
+    assert latency_growth({"upload": [(0.0, 15.0)] * 5}) is None
+    assert latency_growth({}) is None
+
+
+def test_window_throughput_ignores_warmup_and_drain():
+    # 2 rps arrivals over 20 s, each answered 5 s later: keeps up with the load.
+    completions = [5.0 + i * 0.5 for i in range(40)]
+    assert window_throughput(completions, start=0.0, duration=20.0) == 2.0
+    assert window_throughput([25.0, 30.0], start=0.0, duration=20.0) == 0.0
+
+
+def _step_result(**overrides) -> dict:
+    endpoint = {"requests": 40, "error_rate": 0.0, "error_kinds": {}}
+    result = {
+        "offered_rps": 2.0,
+        "achieved_rps": 2.0,
+        "elapsed_s": 25.0,
+        "drain_s": 5.0,
+        "error_rate": 0.0,
+        "latency_growth": 1.0,
+        "endpoints": {"study-sheet": endpoint},
+    }
+    result.update(overrides)
+    return result
+
+
+def test_is_saturated_false_when_keeping_up():
+    assert not is_saturated(_step_result(), growth_threshold=2.0)
+
+
+def test_is_saturated_when_every_request_times_out():
+    # Timed-out latencies are capped at --timeout, so growth and drain look flat.
+    result = _step_result(
+        offered_rps=8.0,
+        achieved_rps=0.0,
+        elapsed_s=10.0,
+        drain_s=5.0,
+        error_rate=1.0,
+        latency_growth=1.0,
+        endpoints={"study-sheet": {"requests": 40, "error_rate": 1.0, "error_kinds": {"timeout": 40}}},
+    )
+    assert is_saturated(result, growth_threshold=2.0)
+
+
+def test_is_saturated_when_throughput_falls_short():
+    assert is_saturated(_step_result(achieved_rps=1.0), growth_threshold=2.0)
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "body", "expected"),
+    [
+        ("study-sheet", {"phase": "2-ai-powered", "main_idea": "Recursion"}, False),
+        ("study-sheet", {"phase": "2-fallback-fake-ai"}, True),
+        ("study-sheet", {"phase": "2-ai-powered", "main_idea": "OpenAI API key not configured."}, True),
+        ("challenge", {"title": "Sum of Digits"}, False),
+        ("challenge", {"title": "Sample Challenge"}, True),
+        ("challenge", {"title": "API Key Required"}, True),
+        ("analyze-code", {"phase": "3-ai-tutor", "analysis": "Looks fine."}, False),
+        ("analyze-code", {"phase": "3-fallback-tutor"}, True),
+        ("analyze-code", {"phase": "3-ai-tutor", "analysis": "OpenAI API key not configured."}, True),
+        ("run-code", {"status": "error"}, False),
+        ("run-code", {"status": "timeout"}, True),
+        ("upload", {}, False),
+    ],
+)
+def test_is_fallback(endpoint, body, expected):
+    assert is_fallback(endpoint, body) is expected
+
+
+def test_send_counts_non_json_body_as_bad_json():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<html>proxy error</html>"))
+    stats = EndpointStats()
+
+    async def go():
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+            await _send(client, "study-sheet", {"method": "GET", "url": "/status"}, 0.0, stats)
+
+    asyncio.run(go())
+    assert (stats.ok, stats.errors) == (0, 1)
+    assert stats.error_kinds == {"bad_json": 1}